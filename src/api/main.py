@@ -1,11 +1,15 @@
 import os
 import time
+import asyncio
+import functools
+import math
 from typing import List, Dict, Any
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import chromadb
 from chromadb.config import Settings
+from openai import APIConnectionError, RateLimitError, InternalServerError
 
 from src.generator.llm import chat_complete
 from langchain_openai import OpenAIEmbeddings
@@ -32,11 +36,29 @@ app.add_middleware(
 CHROMA_PATH = os.getenv("CHROMA_PATH", "data/chroma")
 CHROMA_COLLECTION = os.getenv("CHROMA_COLLECTION", "docs")
 
+# Transient OpenAI failures (timeouts included) that degrade the answer instead of failing it
+TRANSIENT_OPENAI_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+# Latency budget / graceful degradation
+DEFAULT_SLO_MS = int(os.getenv("DEFAULT_SLO_MS", "20000"))
+MIN_LLM_BUDGET_MS = int(os.getenv("MIN_LLM_BUDGET_MS", "2000"))
+QUEUE_DEPTH_HIGH = int(os.getenv("QUEUE_DEPTH_HIGH", "4"))
+RERANK_GAP_THRESHOLD = float(os.getenv("RERANK_GAP_THRESHOLD", "0.15"))
+TOP_K = 8
+KEEP_K = 5
+MAX_TOKENS = 800
+
+# Requests currently being processed by /ask (this one included)
+in_flight = 0
+# Worker threads given up on after a deadline but still running in the executor
+abandoned = 0
+
 # Initialize ChromaDB client
 chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
 
 class QuestionRequest(BaseModel):
     question: str
+    latency_budget_ms: int | None = Field(default=None, gt=0)
 
 class Source(BaseModel):
     title: str
@@ -49,6 +71,7 @@ class Source(BaseModel):
 class AnswerResponse(BaseModel):
     answer: str
     sources: List[Source]
+    degraded: bool = False
 
 def get_collection():
     """Get or create the ChromaDB collection."""
@@ -57,12 +80,22 @@ def get_collection():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Collection '{CHROMA_COLLECTION}' not found. Run build_index.py first.")
 
-def retrieve_documents(question: str, top_k: int = 5) -> List[Dict[str, Any]]:
-    """Retrieve relevant documents from ChromaDB."""
+@functools.lru_cache(maxsize=32)
+def embedder_for(timeout_s: int) -> OpenAIEmbeddings:
+    """Embeddings client whose requests cannot outlive ``timeout_s`` (no retries)."""
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL, request_timeout=timeout_s, max_retries=0)
+
+def retrieve_documents(question: str, top_k: int = 5, timeout: float | None = None) -> List[Dict[str, Any]]:
+    """Retrieve relevant documents from ChromaDB.
+
+    With ``timeout`` the embedding request is capped to it (rounded up to whole
+    seconds), so a worker abandoned at the deadline still finishes shortly after.
+    """
     collection = get_collection()
 
     # Embeda a pergunta com o MESMO modelo do índice
-    q_vec = emb.embed_query(question)
+    embedder = emb if timeout is None else embedder_for(max(1, math.ceil(timeout)))
+    q_vec = embedder.embed_query(question)
 
     results = collection.query(
         query_embeddings=[q_vec],
@@ -86,6 +119,45 @@ def rerank_documents(docs: List[Dict[str, Any]], question: str) -> List[Dict[str
     """Simple reranking by distance (placeholder for cross-encoder)."""
     return sorted(docs, key=lambda x: x["distance"])
 
+def should_rerank(docs: List[Dict[str, Any]]) -> bool:
+    """Rerank only when the top hits are close; a clear winner keeps the vector order."""
+    if len(docs) < 2:
+        return False
+    return docs[1]["distance"] - docs[0]["distance"] < RERANK_GAP_THRESHOLD
+
+def plan_pipeline(budget_s: float, depth: int) -> Dict[str, int]:
+    """Shrink candidate counts and max_tokens under queue pressure or a tight budget."""
+    load_scale = min(1.0, QUEUE_DEPTH_HIGH / max(depth, 1))
+    budget_scale = min(1.0, budget_s / (DEFAULT_SLO_MS / 1000))
+    scale = max(0.25, min(load_scale, budget_scale))
+    return {
+        "top_k": max(3, round(TOP_K * scale)),
+        "keep_k": max(2, round(KEEP_K * scale)),
+        "max_tokens": max(200, round(MAX_TOKENS * scale)),
+    }
+
+def _release_abandoned(fut: asyncio.Future) -> None:
+    global abandoned
+    abandoned -= 1
+    if not fut.cancelled():
+        fut.exception()  # consume it so asyncio does not log "never retrieved"
+
+async def run_until(deadline: float, func, *args, **kwargs):
+    """Run a blocking call in the executor, giving up at the deadline.
+
+    The worker thread cannot be cancelled, so on timeout it stays counted in
+    ``abandoned`` (and in the load signal) until it actually finishes.
+    """
+    global abandoned
+    loop = asyncio.get_running_loop()
+    fut = loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    try:
+        return await asyncio.wait_for(asyncio.shield(fut), timeout=max(deadline - time.time(), 0))
+    except asyncio.TimeoutError:
+        abandoned += 1
+        fut.add_done_callback(_release_abandoned)
+        raise
+
 def build_prompt(question: str, docs: List[Dict[str, Any]]) -> str:
     """Build the prompt with context and question."""
     if not docs:
@@ -160,33 +232,78 @@ async def health_check():
 
 @app.post("/ask", response_model=AnswerResponse)
 async def ask_question(request: QuestionRequest):
-    """Ask a question and get an answer with sources."""
+    """Ask a question and get an answer with sources.
+
+    The pipeline adapts to the latency budget (``latency_budget_ms`` or
+    ``DEFAULT_SLO_MS``) and to the current load (requests in flight plus calls
+    abandoned after a timeout). When the LLM cannot answer in time, the retrieved
+    sources are returned without an answer.
+    """
+    global in_flight
+    in_flight += 1
     try:
         start_time = time.time()
+        budget_s = (request.latency_budget_ms or DEFAULT_SLO_MS) / 1000
+        deadline = start_time + budget_s
+        plan = plan_pipeline(budget_s, in_flight + abandoned)
         
-        # Retrieve relevant documents
-        docs = retrieve_documents(request.question, top_k=8)
+        # Retrieve relevant documents within the budget
+        try:
+            docs = await run_until(
+                deadline, retrieve_documents, request.question, plan["top_k"],
+                timeout=deadline - time.time()
+            )
+        except (asyncio.TimeoutError, *TRANSIENT_OPENAI_ERRORS) as e:
+            print(f"[WARN] Retrieval failed ({type(e).__name__}) after {time.time() - start_time:.2f}s (in flight: {in_flight}, abandoned: {abandoned})")
+            return AnswerResponse(
+                answer="The documents could not be searched within the latency budget. Please try again.",
+                sources=[],
+                degraded=True
+            )
         
-        # Rerank documents
-        ranked_docs = rerank_documents(docs, request.question)[:5]
-        
-        # Build prompt
-        prompt = build_prompt(request.question, ranked_docs)
-        
-        # Generate answer
-        answer = chat_complete(prompt, temperature=0.1, max_tokens=800)
+        # Rerank documents (skipped when the top hit clearly wins)
+        if should_rerank(docs):
+            docs = rerank_documents(docs, request.question)
+        ranked_docs = docs[:plan["keep_k"]]
         
         # Format sources
         sources = format_sources(ranked_docs)
         
+        # Generate answer within the remaining budget
+        remaining = deadline - time.time()
+        answer = None
+        if remaining * 1000 >= MIN_LLM_BUDGET_MS:
+            prompt = build_prompt(request.question, ranked_docs)
+            try:
+                # No retries: a retry would outlive the budget
+                answer = await run_until(
+                    deadline, chat_complete, prompt,
+                    temperature=0.1, max_tokens=plan["max_tokens"],
+                    timeout=remaining, max_retries=0
+                )
+            except (asyncio.TimeoutError, *TRANSIENT_OPENAI_ERRORS) as e:
+                if not isinstance(e, asyncio.TimeoutError):
+                    print(f"[WARN] LLM call failed: {type(e).__name__}: {e}")
+                answer = None
+        
         processing_time = time.time() - start_time
-        print(f"[INFO] Question processed in {processing_time:.2f}s")
+        if answer is None:
+            print(f"[WARN] LLM skipped, returning retrieval-only results after {processing_time:.2f}s (in flight: {in_flight}, abandoned: {abandoned})")
+            return AnswerResponse(
+                answer="The answer could not be generated within the latency budget. See the sources below for the most relevant excerpts.",
+                sources=sources,
+                degraded=True
+            )
+        
+        print(f"[INFO] Question processed in {processing_time:.2f}s (in flight: {in_flight}, abandoned: {abandoned}, plan: {plan})")
         
         return AnswerResponse(answer=answer, sources=sources)
         
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        in_flight -= 1
 
 @app.get("/")
 async def root():
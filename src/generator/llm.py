@@ -56,6 +56,8 @@ def chat_complete(
     model: str | None = None,
     temperature: float = 0.2,
     max_tokens: int = 600,
+    timeout: float | None = None,
+    max_retries: int | None = None,
 ) -> str:
     model = model or os.getenv("CHAT_MODEL", "gpt-4o-mini")
 
@@ -64,7 +66,15 @@ def chat_complete(
     else:
         messages = messages_or_text
 
-    resp = _client.chat.completions.create(
+    # None mantém os defaults do client (um timeout=None explícito desligaria o timeout)
+    opts = {}
+    if timeout is not None:
+        opts["timeout"] = timeout
+    if max_retries is not None:
+        opts["max_retries"] = max_retries
+    client = _client.with_options(**opts) if opts else _client
+
+    resp = client.chat.completions.create(
         model=model,
         messages=messages,
         temperature=temperature,
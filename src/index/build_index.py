@@ -2,45 +2,66 @@ import os, json
 import chromadb
 from dotenv import load_dotenv
 from src.ingest.parse_docs import load_raw_docs
-from src.ingest.chunking import chunk_document
+from src.ingest.chunking import iter_chunks
 from langchain_openai import OpenAIEmbeddings
 
+BATCH_SIZE = 64
+
+def to_metadata(c):
+    return {
+        "doc_id": c.get("doc_id"),
+        "title": c.get("title") or (c.get("source") and os.path.basename(c["source"])) or "document",
+        "source": c.get("source") or c.get("title") or "unknown",
+        "page": c.get("page"),              # pode ser None
+        "section": c.get("section"),        # índice da seção (na página, quando houver)
+    }
+
+def flush(coll, embeds, batch):
+    texts = [c["text"] for c in batch]
+    vectors = embeds.embed_documents(texts)
+    if not vectors:
+        raise ValueError("Falha ao gerar embeddings (lista vazia).")
+    coll.upsert(
+        ids=[c["chunk_id"] for c in batch],
+        documents=texts,
+        metadatas=[to_metadata(c) for c in batch],
+        embeddings=vectors,
+    )
+
 def main():
     load_dotenv()
     client = chromadb.PersistentClient(path="data/chroma")
     coll = client.get_or_create_collection("docs")
     embeds = OpenAIEmbeddings(model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-large"))
 
-    docs = load_raw_docs()
-    all_chunks = []
-    for d in docs:
-        all_chunks.extend(chunk_document(d, max_tokens=400))
+    # indexa em lotes à medida que as páginas são extraídas, sem acumular o corpus inteiro
+    total = 0
+    for d in load_raw_docs():
+        batch, new_ids = [], set()
+        for c in iter_chunks(d, max_tokens=400):
+            # filtra chunks vazios
+            if not (c.get("text") and c["text"].strip()):
+                continue
+            batch.append(c)
+            new_ids.add(c["chunk_id"])
+            if len(batch) >= BATCH_SIZE:
+                flush(coll, embeds, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            flush(coll, embeds, batch)
+            total += len(batch)
+        # só depois do documento inteiro gravado: remove chunks antigos que não
+        # existem mais (ids/páginas podem ter mudado entre versões)
+        stale = set(coll.get(where={"doc_id": d["id"]}, include=[])["ids"]) - new_ids
+        if stale:
+            coll.delete(ids=list(stale))
 
-    # filtra chunks vazios
-    cleaned = [c for c in all_chunks if c.get("text") and c["text"].strip()]
-    if not cleaned:
+    if not total:
         print("Nenhum texto para indexar. Verifique data/raw e o parser.")
         return
 
-    ids = [c["chunk_id"] for c in cleaned]
-    texts = [c["text"] for c in cleaned]
-    metadatas = []
-    for c in cleaned:
-        metadatas.append({
-            "doc_id": c.get("doc_id"),
-            "title": c.get("title") or (c.get("source") and os.path.basename(c["source"])) or "document",
-            "source": c.get("source") or c.get("title") or "unknown",
-            "page": c.get("page"),              # pode ser None
-            "section": c.get("section"),        # índice do chunk
-        })
-
-    # upsert
-    vectors = embeds.embed_documents(texts)
-    if not vectors:
-        raise ValueError("Falha ao gerar embeddings (lista vazia).")
-
-    coll.upsert(ids=ids, documents=texts, metadatas=metadatas, embeddings=vectors)
-    print(f"Indexed {len(ids)} chunks")
+    print(f"Indexed {total} chunks")
     print(f">> Count atual na coleção: {coll.count()}")
 
 if __name__ == "__main__":
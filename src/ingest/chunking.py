@@ -1,5 +1,5 @@
 import re
-from typing import List, Dict
+from typing import List, Dict, Iterator
 
 def split_by_headings(text: str):
     # Heurística simples: títulos por markdown ou linhas maiúsculas longas
@@ -24,8 +24,12 @@ def smart_chunk(text: str, max_tokens=400, overlap_tokens=60):
         chunks.append(" ".join(cur))
     return chunks
 
-def chunk_document(doc: Dict, max_tokens=400):
+def chunk_document(doc: Dict, max_tokens=400, page=None):
+    if "text" not in doc:
+        # documento paginado (PDF): fatia página a página
+        return list(iter_chunks(doc, max_tokens=max_tokens))
     sections = split_by_headings(doc["text"]) or [doc["text"]]
+    prefix = f"{doc['id']}_p{page}" if page is not None else doc["id"]
     all_chunks = []
     for i, sec in enumerate(sections):
         chunks = smart_chunk(sec, max_tokens=max_tokens)
@@ -33,8 +37,18 @@ def chunk_document(doc: Dict, max_tokens=400):
             all_chunks.append({
                 "doc_id": doc["id"],
                 "title": doc["title"],
+                "source": doc.get("path"),
+                "page": page,
                 "section": i,
-                "chunk_id": f"{doc['id']}_{i}_{j}",
+                "chunk_id": f"{prefix}_{i}_{j}",
                 "text": ch
             })
-    return all_chunks
\ No newline at end of file
+    return all_chunks
+
+def iter_chunks(doc: Dict, max_tokens=400) -> Iterator[Dict]:
+    # Documentos paginados (PDF) são fatiados página a página, sem cruzar fronteiras
+    if "pages" not in doc:
+        yield from chunk_document(doc, max_tokens=max_tokens)
+        return
+    for page, text in doc["pages"]():
+        yield from chunk_document({**doc, "text": text}, max_tokens=max_tokens, page=page)
\ No newline at end of file
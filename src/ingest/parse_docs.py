@@ -1,11 +1,46 @@
-import os, hashlib, datetime
+import os, hashlib, datetime, functools
 from pypdf import PdfReader
 from bs4 import BeautifulSoup
 
+# páginas lidas por instância de PdfReader (ver iter_pdf_pages)
+PDF_PAGE_WINDOW = 25
+
+def has_text_layer(page):
+    # Páginas só com imagem (scans) não têm fontes: pula sem tentar extrair texto
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    if "/Font" in resources:
+        return True
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return False
+    xobjects = xobjects.get_object()
+    return any(xobjects[name].get_object().get("/Subtype") == "/Form" for name in xobjects)
+
+def iter_pdf_pages(path, window=PDF_PAGE_WINDOW):
+    # Gera (número da página 1-based, texto) uma página por vez.
+    # O PdfReader guarda cada objeto já resolvido, então é reaberto a cada janela
+    # de páginas para liberar esse cache. O PdfReader recebe o handle do arquivo
+    # (não o caminho) para ler do disco sob demanda em vez de carregar o PDF
+    # inteiro na memória.
+    with open(path, "rb") as fh:
+        start, total = 0, None
+        while total is None or start < total:
+            reader = PdfReader(fh)
+            total = len(reader.pages)
+            for i in range(start, min(start + window, total)):
+                page = reader.pages[i]
+                if not has_text_layer(page):
+                    continue
+                text = page.extract_text() or ""
+                if text.strip():
+                    yield i + 1, text
+            start += window
+
 def read_pdf(path):
-    reader = PdfReader(path)
-    text = "\n".join([p.extract_text() or "" for p in reader.pages])
-    return text
+    return "\n".join(text for _, text in iter_pdf_pages(path))
 
 def read_md(path):
     with open(path, "r", encoding="utf-8") as f:
@@ -21,19 +56,23 @@ def load_raw_docs(raw_dir="data/raw"):
     for root, _, files in os.walk(raw_dir):
         for fn in files:
             p = os.path.join(root, fn)
+            doc = {
+                "id": hashlib.md5(p.encode()).hexdigest(),
+                "path": p,
+                "title": os.path.splitext(fn)[0],
+                "ingested_at": datetime.datetime.utcnow().isoformat()
+            }
             if fn.lower().endswith(".pdf"):
-                text = read_pdf(p)
+                # páginas extraídas sob demanda durante o chunking; cada chamada relê o arquivo
+                doc["pages"] = functools.partial(iter_pdf_pages, p)
+                docs.append(doc)
+                continue
             elif fn.lower().endswith(".md"):
                 text = read_md(p)
             elif fn.lower().endswith((".html", ".htm")):
                 text = read_html(p)
             else:
                 continue
-            docs.append({
-                "id": hashlib.md5(p.encode()).hexdigest(),
-                "path": p,
-                "title": os.path.splitext(fn)[0],
-                "text": text,
-                "ingested_at": datetime.datetime.utcnow().isoformat()
-            })
+            doc["text"] = text
+            docs.append(doc)
     return docs
\ No newline at end of file
@@ -14,14 +14,21 @@ st.set_page_config(
 
 # API Configuration
 RAG_API_URL = os.getenv("RAG_API_URL", "http://localhost:8000")
+API_TIMEOUT_S = 30
+# Optional per-request budget; unset uses the server's DEFAULT_SLO_MS.
+# Keep it below API_TIMEOUT_S so the API can degrade instead of timing out.
+LATENCY_BUDGET_MS = os.getenv("LATENCY_BUDGET_MS")
 
 def call_rag_api(question: str) -> dict:
     """Call the RAG API with a question."""
+    payload = {"question": question}
+    if LATENCY_BUDGET_MS:
+        payload["latency_budget_ms"] = int(LATENCY_BUDGET_MS)
     try:
         response = requests.post(
             f"{RAG_API_URL}/ask",
-            json={"question": question},
-            timeout=30
+            json=payload,
+            timeout=API_TIMEOUT_S
         )
         response.raise_for_status()
         return response.json()
@@ -115,7 +122,10 @@ if hasattr(st.session_state, 'last_result') and st.session_state.last_result:
     # Answer section
     st.subheader("📝 Answer")
     answer = st.session_state.last_result.get("answer", "No answer provided.")
-    st.markdown(answer)
+    if st.session_state.last_result.get("degraded"):
+        st.warning(answer)
+    else:
+        st.markdown(answer)
     
     # Sources section
     if show_sources: